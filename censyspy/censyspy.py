@@ -1,21 +1,32 @@
 #!/usr/bin/env python3
 from censys.search import CensysHosts, CensysCerts
-from collections import defaultdict
-from typing import Dict, Set, Optional, Union, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, Tuple, Union, List
 import argparse
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
 from dotenv import load_dotenv
 import os
+import sys
+import threading
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
-DataTypes = Union[Dict[str, Set[str]], Dict[str, Dict[str, List[str]]]]
+DATA_TYPES = ("dns", "certificate")
+_VALID_DATA_TYPES = frozenset(DATA_TYPES)
+
+# Fields requested from the hosts and certificates indexes
+_DNS_FIELDS = ("ip", "dns.names", "dns.reverse_dns.names", "last_updated_at")
+_CERT_FIELDS = ("names", "added_at")
 
 
 def print_banner():
@@ -31,18 +42,40 @@ FQDN Enumeration through Censys Search API
     print(banner)
 
 
-def is_domain_match(hostname: str, domain: str) -> Optional[str]:
-    """Returns hostname if it matches the domain pattern, None otherwise."""
-    if not hostname or not domain:
-        return None
+@lru_cache(maxsize=65536)
+def normalize_hostname(hostname: str) -> str:
+    """Lowercase a hostname and strip any trailing root dot.
+
+    Censys returns the same names over and over (SANs, shared PTR records),
+    so results are memoized; use normalize_hostname.cache_info() to inspect.
+    """
+    return sys.intern(hostname.rstrip(".").lower())
+
 
-    hostname = hostname.rstrip(".").lower()
-    domain = domain.rstrip(".").lower()
+class DomainMatcher:
+    """Matches hostnames against one domain, normalized once up front."""
+
+    __slots__ = ("domain", "dot_domain")
+
+    def __init__(self, domain: Optional[str]) -> None:
+        self.domain = normalize_hostname(domain) if domain else None
+        self.dot_domain = f".{self.domain}"
+
+    def match(self, hostname: str) -> Optional[str]:
+        """Returns the normalized hostname if it matches the domain, None otherwise."""
+        if not hostname or not self.domain:
+            return None
+
+        hostname = normalize_hostname(hostname)
+        if hostname == self.domain or hostname.endswith(self.dot_domain):
+            return hostname
+
+        return None
 
-    if hostname.endswith(f".{domain}") or hostname == domain:
-        return hostname
 
-    return None
+def is_domain_match(hostname: str, domain: str) -> Optional[str]:
+    """Returns hostname if it matches the domain pattern, None otherwise."""
+    return DomainMatcher(domain).match(hostname)
 
 
 def get_date_filter(days: Optional[str]) -> Optional[str]:
@@ -55,20 +88,81 @@ def get_date_filter(days: Optional[str]) -> Optional[str]:
         if days_int <= 0:
             raise ValueError("Days must be positive")
 
-        start_date = (datetime.now() - timedelta(days=days_int)).strftime("%Y-%m-%d")
+        start_date = (date.today() - timedelta(days=days_int)).strftime("%Y-%m-%d")
         return f"[{start_date} TO *]"
     except ValueError as e:
-        logger.error(f"Invalid days value: {e}")
+        logger.error("Invalid days value: %s", e)
         raise
 
 
+# Sources a hostname was seen in, stored as a bitmask on each record
+FORWARD = 1
+REVERSE = 2
+CERTIFICATE = 4
+
+_TYPE_NAMES = ("forward", "reverse", "certificate")
+# Type names for every possible flag combination, indexed by bitmask
+_FLAG_NAMES = tuple(
+    tuple(name for bit, name in enumerate(_TYPE_NAMES) if flags & (1 << bit))
+    for flags in range(1 << len(_TYPE_NAMES))
+)
+
+
+class _Record:
+    """Source flags shared by the per-hostname records."""
+
+    __slots__ = ("flags",)
+
+    def __init__(self) -> None:
+        self.flags = 0
+
+    @property
+    def types(self) -> Tuple[str, ...]:
+        return _FLAG_NAMES[self.flags]
+
+
+class DNSRecord(_Record):
+    """DNS sightings collected for a single hostname."""
+
+    __slots__ = ("last_updated",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.last_updated: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Union[List[str], Optional[str]]]:
+        return {"types": list(self.types), "last_updated": self.last_updated}
+
+
+class CertificateRecord(_Record):
+    """Certificate sightings collected for a single hostname."""
+
+    __slots__ = ("added_at",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.added_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Union[List[str], Optional[str]]]:
+        return {"types": list(self.types), "added_at": self.added_at}
+
+
+HostRecord = Union[DNSRecord, CertificateRecord]
+DataTypes = Union[Dict[str, HostRecord], Dict[str, Dict[str, HostRecord]]]
+
+
 class CensysDataFetcher:
     def __init__(self, debug: bool = False):
+        # Kept for callers; debug output is controlled by the logger level
         self.debug = debug
         self._hosts_client = None
         self._certs_client = None
         self.timeout = 300  # 5 minute timeout
 
+        # Only read the .env file when the credentials are not already exported
+        if not (os.getenv("CENSYS_API_ID") and os.getenv("CENSYS_API_SECRET")):
+            load_dotenv()
+
         # Load Censys credentials from environment variables
         self.api_id = os.getenv("CENSYS_API_ID")
         self.api_secret = os.getenv("CENSYS_API_SECRET")
@@ -97,18 +191,18 @@ class CensysDataFetcher:
 
     def _build_query(
         self, data_type: str, domain: Optional[str], days: Optional[str]
-    ) -> tuple[str, List[str]]:
+    ) -> Tuple[str, Tuple[str, ...]]:
         """Build query and fields based on data type, domain, and days filter."""
         date_filter = get_date_filter(days)
 
         if data_type == "dns":
             # Search forward and reverse fields for our domain
             base_query = f"(dns.names: {domain} or dns.reverse_dns.names: {domain})"
-            fields = ["ip", "dns.names", "dns.reverse_dns.names", "last_updated_at"]
+            fields = _DNS_FIELDS
             date_field = "last_updated_at"
         else:  # certificate
             base_query = f"names: {domain}" if domain else "names: *"
-            fields = ["names", "added_at"]
+            fields = _CERT_FIELDS
             date_field = "added_at"
 
         if date_filter:
@@ -116,43 +210,55 @@ class CensysDataFetcher:
         else:
             query = base_query
 
-        if self.debug:
-            logger.debug(f"Generated query: {query}")
+        logger.debug("Generated query: %s", query)
 
         return query, fields
 
     def _process_dns_result(
-        self, result: dict, domain: str, collected_data: defaultdict
+        self,
+        result: dict,
+        matcher: DomainMatcher,
+        collected_data: Dict[str, HostRecord],
     ) -> None:
         """Process DNS search result and update collected data."""
-        if "dns" not in result:
+        dns_data = result.get("dns")
+        if not dns_data:
             return
 
-        dns_data = result["dns"]
         last_updated = result.get("last_updated_at")
-
-        # Process forward DNS names
-        for name in dns_data.get("names", []):
-            if matched_hostname := is_domain_match(name, domain):
-                collected_data[matched_hostname]["types"].add("forward")
-                collected_data[matched_hostname]["last_updated"] = last_updated
-
-        # Process reverse DNS names
-        for name in dns_data.get("reverse_dns", {}).get("names", []):
-            if matched_hostname := is_domain_match(name, domain):
-                collected_data[matched_hostname]["types"].add("reverse")
-                collected_data[matched_hostname]["last_updated"] = last_updated
+        reverse_dns = dns_data.get("reverse_dns")
+
+        # Process forward and reverse DNS names in one pass
+        for names, flag in (
+            (dns_data.get("names"), FORWARD),
+            (reverse_dns.get("names") if reverse_dns else None, REVERSE),
+        ):
+            if not names:
+                continue
+            for name in names:
+                if matched_hostname := matcher.match(name):
+                    record = collected_data.get(matched_hostname)
+                    if record is None:
+                        record = collected_data[matched_hostname] = DNSRecord()
+                    record.flags |= flag
+                    record.last_updated = last_updated
 
     def _process_cert_result(
-        self, result: dict, domain: str, collected_data: defaultdict
+        self,
+        result: dict,
+        matcher: DomainMatcher,
+        collected_data: Dict[str, HostRecord],
     ) -> None:
         """Process certificate search result and update collected data."""
         added_at = result.get("added_at")
 
         for name in result.get("names", []):
-            if matched_hostname := is_domain_match(name, domain):
-                collected_data[matched_hostname]["types"].add("certificate")
-                collected_data[matched_hostname]["added_at"] = added_at
+            if matched_hostname := matcher.match(name):
+                record = collected_data.get(matched_hostname)
+                if record is None:
+                    record = collected_data[matched_hostname] = CertificateRecord()
+                record.flags |= CERTIFICATE
+                record.added_at = added_at
 
     def fetch_data(
         self,
@@ -161,38 +267,45 @@ class CensysDataFetcher:
         days: Optional[str] = None,
         page_size: int = 100,
         max_pages: int = -1,
-    ) -> Dict[str, Dict[str, Union[Set[str], str]]]:
-        """Fetch data from Censys Search API."""
-        if data_type not in ("dns", "certificate"):
+        stop_event: Optional[threading.Event] = None,
+    ) -> Dict[str, HostRecord]:
+        """Fetch data from Censys Search API.
+
+        If stop_event is given and gets set, the search stops after the
+        current page and returns what has been collected so far.
+        """
+        if data_type not in _VALID_DATA_TYPES:
             raise ValueError("Invalid data_type. Choose 'dns' or 'certificate'.")
 
-        collected_data = defaultdict(
-            lambda: {"types": set(), "last_updated": None, "added_at": None}
-        )
+        collected_data: Dict[str, HostRecord] = {}
         query, fields = self._build_query(data_type, domain, days)
+        matcher = DomainMatcher(domain)
 
         try:
-            client = self.hosts_client if data_type == "dns" else self.certs_client
+            if data_type == "dns":
+                client = self.hosts_client
+                process = self._process_dns_result
+            else:
+                client = self.certs_client
+                process = self._process_cert_result
+
             search_results = client.search(
                 query, fields=fields, per_page=page_size, pages=max_pages
             )
 
             for result in search_results:
-                if isinstance(result, list):
-                    items = result
-                else:
-                    items = [result]
-
+                items = result if isinstance(result, list) else (result,)
                 for item in items:
-                    if data_type == "dns":
-                        self._process_dns_result(item, domain, collected_data)
-                    else:
-                        self._process_cert_result(item, domain, collected_data)
+                    process(item, matcher, collected_data)
+                if stop_event is not None and stop_event.is_set():
+                    logger.debug("Stopping %s search early", data_type)
+                    break
 
         except Exception as e:
-            logger.error(f"Error during search: {str(e)}")
+            logger.error("Error during search: %s", e)
             raise
 
+        logger.debug("Found %d %s matches", len(collected_data), data_type)
         return collected_data
 
 
@@ -203,7 +316,7 @@ def parse_arguments() -> argparse.Namespace:
     )
     parser.add_argument(
         "--data-type",
-        choices=["dns", "certificate", "both"],
+        choices=[*DATA_TYPES, "both"],
         required=True,
         help="Type of data to fetch",
     )
@@ -234,31 +347,54 @@ def parse_arguments() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def format_results(data: DataTypes, max_display: int = 10) -> str:
-    """Format results for display."""
+def _encode_record(obj: object) -> Dict[str, Union[List[str], Optional[str]]]:
+    """JSON encoder hook that converts records as the encoder reaches them."""
+    if isinstance(obj, _Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(data: DataTypes) -> bytes:
+    """Serialize results as indented UTF-8 JSON, using orjson when installed.
+
+    Both encoders write non-ASCII names as raw UTF-8 rather than \\u escapes.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_encode_record, option=orjson.OPT_INDENT_2)
+    return json.dumps(
+        data, indent=2, ensure_ascii=False, default=_encode_record
+    ).encode()
+
+
+def _format_entries(entries: Dict[str, HostRecord], max_display: int) -> List[str]:
+    """Format the first max_display entries plus a count of the rest."""
+    lines = [
+        f"{i}. {name} ({', '.join(record.types)})"
+        for i, (name, record) in enumerate(islice(entries.items(), max_display), 1)
+    ]
+    remaining = len(entries) - max_display
+    if remaining > 0:
+        lines.append(f"... and {remaining} more entries")
+    return lines
+
+
+def format_results(
+    data: DataTypes, max_display: int = 10, *, nested: bool = False
+) -> str:
+    """Format results for display.
+
+    Set nested for results keyed by data type (--data-type both).
+    """
     output = []
 
-    # Handle both types of data structures
-    if isinstance(data, dict) and any(isinstance(v, dict) for v in data.values()):
+    if nested:
         # Handle nested dictionary structure (for --data-type both)
         for data_type, data_items in data.items():
             output.append(f"\n{data_type.upper()} Data:")
-            for i, (name, types) in enumerate(data_items.items(), 1):
-                output.append(f"{i}. {name} ({', '.join(types)})")
-                if i >= max_display:
-                    remaining = len(data_items) - max_display
-                    if remaining > 0:
-                        output.append(f"... and {remaining} more entries")
-                    break
+            output.extend(_format_entries(data_items, max_display))
     else:
         # Handle flat dictionary structure (for single data type)
-        for i, (name, types) in enumerate(data.items(), 1):
-            output.append(f"{i}. {name} ({', '.join(types)})")
-            if i >= max_display:
-                remaining = len(data) - max_display
-                if remaining > 0:
-                    output.append(f"... and {remaining} more entries")
-                break
+        output.extend(_format_entries(data, max_display))
 
     return "\n".join(output)
 
@@ -276,57 +412,54 @@ def main():
         fetcher = CensysDataFetcher(debug=args.debug)
 
         if args.data_type == "both":
-            result = {
-                "dns": {
-                    dns: {
-                        "types": list(data["types"]),
-                        "last_updated": data["last_updated"],
-                    }
-                    for dns, data in fetcher.fetch_data(
-                        "dns", args.domain, args.days, args.page_size, args.max_pages
-                    ).items()
-                },
-                "certificate": {
-                    cert: {"types": list(data["types"]), "added_at": data["added_at"]}
-                    for cert, data in fetcher.fetch_data(
-                        "certificate",
-                        args.domain,
-                        args.days,
-                        args.page_size,
-                        args.max_pages,
-                    ).items()
-                },
+            # The two searches are independent and network bound, and each
+            # uses its own client, so run them concurrently.
+            stop = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=len(DATA_TYPES))
+            futures = {
+                executor.submit(
+                    fetcher.fetch_data,
+                    data_type,
+                    args.domain,
+                    args.days,
+                    args.page_size,
+                    args.max_pages,
+                    stop,
+                ): data_type
+                for data_type in DATA_TYPES
             }
+            collected = {}
+            try:
+                for future in as_completed(futures):
+                    collected[futures[future]] = future.result()
+            except BaseException:
+                # Don't wait for the other search to run to completion:
+                # tell it to stop after its current page and bail out.
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
+                raise
+            executor.shutdown()
+            result = {data_type: collected[data_type] for data_type in DATA_TYPES}
         else:
-            collected_data = fetcher.fetch_data(
+            result = fetcher.fetch_data(
                 args.data_type, args.domain, args.days, args.page_size, args.max_pages
             )
-            if args.data_type == "dns":
-                result = {
-                    name: {
-                        "types": list(data["types"]),
-                        "last_updated": data["last_updated"],
-                    }
-                    for name, data in collected_data.items()
-                }
-            else:  # certificate
-                result = {
-                    name: {"types": list(data["types"]), "added_at": data["added_at"]}
-                    for name, data in collected_data.items()
-                }
-
-        with open(args.output, "w") as f:
-            json.dump(result, f, indent=2)
-        logger.info(f"Results written to {args.output}")
+
+        output = dumps_json(result)
+        with open(args.output, "wb") as f:
+            f.write(output)
+        logger.info("Results written to %s", args.output)
 
         if args.json or args.debug:
-            print(json.dumps(result, indent=2))
+            print(output.decode())
         else:
             print("\nCollected data summary:")
-            print(format_results(result))
+            print(format_results(result, nested=args.data_type == "both"))
 
     except Exception as e:
-        logger.error(f"Error during execution: {str(e)}")
+        logger.error("Error during execution: %s", e)
         if args.debug:
             logger.exception("Detailed error information:")
         exit(1)
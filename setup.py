@@ -7,6 +7,9 @@ setup(
     install_requires=[
         "censys>=2.2.16",
     ],
+    extras_require={
+        "fast": ["orjson"],
+    },
     entry_points={
         'console_scripts': [
             'censyspy=censyspy:main',